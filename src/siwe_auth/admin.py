@@ -73,3 +73,5 @@ class WalletBaseAdmin(BaseUserAdmin):
         "ens_name",
     )
     filter_horizontal = ()
+    # Wallet has no foreign keys to join and the changelist shows no many-to-many relations.
+    list_select_related = ()
@@ -1,6 +1,26 @@
+import django
 from django.apps import AppConfig
+from django.core.exceptions import ImproperlyConfigured
 
 
 class SiweAuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'siwe_auth'
+
+    def ready(self):
+        from siwe_auth import constants, utils
+        from siwe_auth.conf import settings
+
+        # The cache nonce store needs cache.delete() to report whether the nonce existed (Django 3.1+).
+        if settings.NONCE_STORE == "cache" and django.VERSION < (3, 1):
+            raise ImproperlyConfigured(constants.ERROR_NONCE_STORE_DJANGO_VERSION)
+
+        # Build the shared Web3 instance (and inject its middleware) at startup instead of on first login.
+        if settings.PROVIDER:
+            utils._get_w3(settings.PROVIDER)
+
+        # Fail at startup rather than on login when background tasks have no backend to run on.
+        if settings.ASYNC_AUTH_TASKS:
+            from siwe_auth import tasks
+
+            tasks.check_backend()
@@ -30,16 +30,18 @@ Author: Giovanni Borgogno
 Date: January 27th, 2024
 """
 
-import datetime
+from functools import lru_cache
 import logging
 from typing import Optional
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.functional import empty
 from ens import ENS
-from web3 import Web3, HTTPProvider
-from web3.middleware import geth_poa_middleware
-import pytz
+from web3 import Web3
 from siwe import (
     ExpiredMessage,
     InvalidSignature,
@@ -53,21 +55,59 @@ from siwe_auth.conf import settings
 
 WalletModel = get_user_model()
 
+# Columns loaded when restoring the user of a session, `password` is needed to verify the session hash
+# and the ENS fields are serialized by the `me` view.
+AUTH_WALLET_FIELDS = (
+    "ethereum_address",
+    "password",
+    "ens_name",
+    "ens_avatar",
+    "is_active",
+    "is_admin",
+    "is_superuser",
+    "last_login",
+)
+# Custom user models (e.g. extending `AbstractWallet`) are loaded whole, so their own fields are never deferred.
+LOAD_AUTH_WALLET_FIELDS_ONLY = WalletModel._meta.label == "siwe_auth.Wallet"
+
+
+@lru_cache(maxsize=1)
+def _get_ens(w3: Web3) -> ENS:
+    """
+    Return an ENS instance sharing the provider of the given Web3 instance.
+    """
+    return ENS.from_web3(w3)
+
 
 class ENSProfile:
     """
     Container for ENS profile information including but not limited to primary name and avatar.
     """
 
-    name: str = None
-    avatar: str = None
+    __slots__ = ("name", "avatar")
 
     def __init__(self, ethereum_address: str, w3: Web3):
-        ns = ENS.from_web3(w3)
+        self.name: Optional[str] = None
+        self.avatar: Optional[str] = None
+        cache_key = f"siwe:ens:{ethereum_address.lower()}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            self.name = cached["name"]
+            self.avatar = cached["avatar"]
+            return
+
+        ns = _get_ens(w3)
         self.name = ns.name(address=ethereum_address)
         if self.name:
             self.avatar = ns.get_text(self.name, "avatar")
-            
+        cache.set(cache_key, {"name": self.name, "avatar": self.avatar}, settings.ENS_CACHE_TTL)
+
+
+# Blank ENSProfile shared when ENS profiles are disabled, skipping __init__ constructor
+_EMPTY_ENS_PROFILE = ENSProfile.__new__(ENSProfile)
+_EMPTY_ENS_PROFILE.name = None
+_EMPTY_ENS_PROFILE.avatar = None
+
 
 class SiweBackend(BaseBackend):
     """
@@ -75,9 +115,16 @@ class SiweBackend(BaseBackend):
     """
 
     def authenticate(self, request, signature: str, siwe_message: SiweMessage):
+        # Bind settings once, skipping the LazyObject proxy on each lookup.
+        siwe_settings = settings._wrapped if settings._wrapped is not empty else settings
+        provider = siwe_settings.PROVIDER
+        create_ens_profile = siwe_settings.CREATE_ENS_PROFILE_ON_AUTH
+        check_groups = siwe_settings.CREATE_GROUPS_ON_AUTH and siwe_settings._group_managers
+        run_async = siwe_settings.ASYNC_AUTH_TASKS
+
+        w3 = utils._get_w3(provider)
+
         # Validate signature
-        w3 = Web3(HTTPProvider(settings.PROVIDER))
-        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         try:
             siwe_message.verify(signature=signature)
         except (ExpiredMessage, MalformedSession, InvalidSignature, VerificationError) as e:
@@ -89,57 +136,77 @@ class SiweBackend(BaseBackend):
                 }
 
             error = error_messages.get(type(e), "unknown error")
-            logging.debug(f"Authentication attempt rejected due to {error}.")
+            logging.debug("Authentication attempt rejected due to %s.", error)
             return None
 
         # Validate nonce
         if not utils._nonce_is_valid(siwe_message.nonce):
             return None
 
-        # Pull ENS data
-        if settings.CREATE_ENS_PROFILE_ON_AUTH:
+        # Pull ENS data, unless it is refreshed by a background task
+        defer_ens_profile = create_ens_profile and run_async
+        if create_ens_profile and not defer_ens_profile:
             ens_profile = ENSProfile(ethereum_address=siwe_message.address, w3=w3)
         else:
-            ens_profile = ENSProfile.__new__(ENSProfile) # blank ENSProfile, skipping __init__ constructor
+            ens_profile = _EMPTY_ENS_PROFILE
 
 
         # Message and nonce has been validated. Authentication complete. Continue with authorization/other.
-        now = datetime.datetime.now(tz=pytz.UTC)
-        try:
-            wallet = WalletModel.objects.get(ethereum_address=siwe_message.address)
-            wallet.last_login = now
-            wallet.ens_name = ens_profile.name
-            wallet.ens_avatar = ens_profile.avatar
-            wallet.save()
-            logging.debug(f"Found wallet for address {siwe_message.address}")
-        except WalletModel.DoesNotExist:
-            wallet = WalletModel(
-                ethereum_address=Web3.to_checksum_address(siwe_message.address),
-                ens_name=ens_profile.name,
-                ens_avatar=ens_profile.avatar,
-                last_login=now,
-                password=None,
-            )
-            wallet.set_unusable_password()
-            wallet.save()
+        now = timezone.now()
+        wallet, created = WalletModel.objects.get_or_create(
+            ethereum_address=Web3.to_checksum_address(siwe_message.address),
+            defaults={
+                "ens_name": ens_profile.name,
+                "ens_avatar": ens_profile.avatar,
+                "last_login": now,
+                "password": make_password(None),
+            },
+        )
+        if created:
             logging.debug(
-                f"Could not find wallet for address {siwe_message.address}. Creating new wallet object."
+                "Could not find wallet for address %s. Created new wallet object.", siwe_message.address
             )
+        else:
+            update_fields = ["last_login"]
+            wallet.last_login = now
+            if not defer_ens_profile:
+                if wallet.ens_name != ens_profile.name:
+                    wallet.ens_name = ens_profile.name
+                    update_fields.append("ens_name")
+                if wallet.ens_avatar != ens_profile.avatar:
+                    wallet.ens_avatar = ens_profile.avatar
+                    update_fields.append("ens_avatar")
+            wallet.save(update_fields=update_fields)
+            logging.debug("Found wallet for address %s", siwe_message.address)
+
+        # Background tasks
+        if run_async:
+            from siwe_auth import tasks  # imported here since tasks imports this module
+
+            if defer_ens_profile:
+                tasks.enqueue(tasks.refresh_ens_profile, wallet.pk)
+            if check_groups:
+                tasks.enqueue(tasks.sync_custom_groups, wallet.pk)
+            return wallet
 
         # Group settings
-        if settings.CREATE_GROUPS_ON_AUTH and settings.CUSTOM_GROUPS:
-            for custom_group in settings.CUSTOM_GROUPS:
-                utils._check_group(custom_group, wallet, HTTPProvider(settings.PROVIDER))
+        if check_groups:
+            utils._check_groups(siwe_settings._group_names, siwe_settings._group_managers, wallet, w3.provider)
 
         return wallet
 
     def get_user(self, ethereum_address: str) -> Optional[WalletModel]:
         """
         Get Wallet by ethereum address if exists.
+        With the default `Wallet` model only the columns needed to authenticate and serialize
+        requests are loaded, other fields (e.g. `created`) are deferred and fetched on first access.
         :param ethereum_address: Ethereum address of user.
         :return: Wallet object if exists or None
         """
+        queryset = WalletModel.objects.all()
+        if LOAD_AUTH_WALLET_FIELDS_ONLY:
+            queryset = queryset.only(*AUTH_WALLET_FIELDS)
         try:
-            return WalletModel.objects.get(pk=ethereum_address)
+            return queryset.get(pk=ethereum_address)
         except WalletModel.DoesNotExist:
             return None
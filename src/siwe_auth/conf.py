@@ -8,7 +8,13 @@ Settings:
 - `PROVIDER`: Ethereum provider URL.
 - `CREATE_GROUPS_ON_AUTH`: Flag indicating whether to create groups on user authentication.
 - `CREATE_ENS_PROFILE_ON_AUTH`: Flag indicating whether to create ENS profiles on user authentication.
+- `ENS_CACHE_TTL`: Seconds to cache resolved ENS profiles in the Django cache.
 - `CUSTOM_GROUPS`: List of custom groups to be created on user authentication.
+- `USE_MULTICALL`: Flag indicating whether custom group checks are batched into a single Multicall3 request.
+- `GROUP_CACHE_TTL`: Seconds to cache custom group membership checks in the Django cache, 0 disables it.
+- `NONCE_STORE`: Where nonces are stored, `"database"` (Nonce model) or `"cache"` (Django cache, e.g. Redis).
+- `ASYNC_AUTH_TASKS`: Flag indicating whether ENS profiles and custom groups are updated by background tasks instead of during login.
+- `ASYNC_TASK_BACKEND`: Backend running background tasks, `"celery"` (Celery workers) is required by `ASYNC_AUTH_TASKS`.
 
 Note: These settings can be configured in Django project settings using the `SIWE_AUTH` namespace.
 
@@ -22,11 +28,17 @@ SIWE_AUTH = {
     "PROVIDER": "https://mainnet.infura.io/v3/...", # required
     "CREATE_GROUPS_ON_AUTH": True, # default False
     "CREATE_ENS_PROFILE_ON_AUTH": True, # default True
+    "ENS_CACHE_TTL": 3600, # default 3600
     "CUSTOM_GROUPS": [
         ("usdt_owners", groups.ERC20OwnerManager(config={'contract': '0x82E...550'})),
         ("nft_owners", groups.ERC721OwnerManager(config={'contract': '0x785...3A5'})),
         # ...
     ], # default []
+    "USE_MULTICALL": True, # default True
+    "GROUP_CACHE_TTL": 0, # default 0
+    "NONCE_STORE": "database", # default "database"
+    "ASYNC_AUTH_TASKS": False, # default False
+    "ASYNC_TASK_BACKEND": None, # default None
 }
 ```
 """
@@ -43,7 +55,13 @@ default_settings = {
     "PROVIDER": None,
     "CREATE_GROUPS_ON_AUTH": False,
     "CREATE_ENS_PROFILE_ON_AUTH": True,
-    "CUSTOM_GROUPS": []
+    "ENS_CACHE_TTL": 3600,
+    "CUSTOM_GROUPS": [],
+    "USE_MULTICALL": True,
+    "GROUP_CACHE_TTL": 0,
+    "NONCE_STORE": "database",
+    "ASYNC_AUTH_TASKS": False,
+    "ASYNC_TASK_BACKEND": None,
 }
 
 SETTINGS_TO_IMPORT = []
@@ -61,6 +79,7 @@ class Settings:
         self._load_default_settings(default_settings)
         self._override_settings(overriden_settings)
         self._init_settings_to_import()
+        self._init_custom_groups()
 
     def _load_default_settings(self, default_settings):
         for setting_name, setting_value in default_settings.items():
@@ -78,6 +97,11 @@ class Settings:
             if isinstance(value, str):
                 setattr(self, setting_name, import_string(value))
 
+    def _init_custom_groups(self):
+        # Split CUSTOM_GROUPS once so authentication iterates ready-made sequences.
+        self._group_names = tuple(name for name, _ in self.CUSTOM_GROUPS)
+        self._group_managers = tuple(manager for _, manager in self.CUSTOM_GROUPS)
+
                 
 class LazySettings(LazyObject):
     def _setup(self, explicit_overriden_settings=None):
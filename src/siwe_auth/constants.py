@@ -1,16 +1,33 @@
 # views.py
 # Rest API response messages:
-MESSAGE_STATUS_200 = lambda msg: f"Successful {msg}."
+def MESSAGE_STATUS_200(msg: str) -> str:
+    return f"Successful {msg}."
+
 MESSAGE_STATUS_400 = "One or more validation errors occurred."
 MESSAGE_STATUS_401 = "Authentication credentials were missing or incorrect."
 MESSAGE_STATUS_403 = "The request is understood, but it has been refused or access is not allowed."
+MESSAGE_STATUS_413 = "The request body is too large."
 MESSAGE_STATUS_500 = "Something went wrong."
 
+# Maximum login request body size in bytes, SIWE messages are well below it:
+MAX_LOGIN_BODY_SIZE = 8192
+
 
 # ValueErrors:
-ERROR_CONFIG = lambda name, attribute: f"{name} Owner Manager config is missing {attribute} attribute."
-ERROR_UNABLE_TO_VERIFY_MEMBERSHIP = lambda address: f"Unable to verify membership of invalid address: {address}."
+def ERROR_CONFIG(name: str, attribute: str) -> str:
+    return f"{name} Owner Manager config is missing {attribute} attribute."
+
+def ERROR_UNABLE_TO_VERIFY_MEMBERSHIP(address: str) -> str:
+    return f"Unable to verify membership of invalid address: {address}."
+
 ERROR_INVALID_ADDRESS = "Ethereum address is required. Please provide a valid checksum address."
+ERROR_MULTICALL_FAILED = "Multicall3 membership check failed, falling back to individual checks."
+ERROR_ASYNC_TASK_BACKEND = "ASYNC_AUTH_TASKS requires ASYNC_TASK_BACKEND to be \"celery\"."
+ERROR_CELERY_NOT_INSTALLED = "ASYNC_TASK_BACKEND is \"celery\" but Celery is not installed."
+ERROR_NONCE_STORE_DJANGO_VERSION = "NONCE_STORE \"cache\" requires Django 3.1 or later."
+
+# Logging templates, formatted lazily by logging:
+LOG_UNABLE_TO_VERIFY_MEMBERSHIP = "Unable to verify membership of invalid address: %s."
 
 # groups.py
 # Contract ABIs:
@@ -43,3 +60,28 @@ ERC20_ABI = [{
         "payable": False,
         "type": "function",
         }]
+
+# Multicall3 (same address on every chain it is deployed to):
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [{
+        "inputs": [{
+            "components": [
+                {"name": "target", "type": "address"},
+                {"name": "allowFailure", "type": "bool"},
+                {"name": "callData", "type": "bytes"},
+            ],
+            "name": "calls",
+            "type": "tuple[]",
+        }],
+        "name": "aggregate3",
+        "outputs": [{
+            "components": [
+                {"name": "success", "type": "bool"},
+                {"name": "returnData", "type": "bytes"},
+            ],
+            "name": "returnData",
+            "type": "tuple[]",
+        }],
+        "stateMutability": "payable",
+        "type": "function",
+        }]
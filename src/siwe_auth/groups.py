@@ -12,14 +12,21 @@ Classes:
 - `ERC721Manager`: Abstract base class for managing membership based on ERC-721 token standard.
 - `ERC721OwnerManager`: Implementation of `ERC721Manager` for checking ownership in ERC-721 token standard.
 
+Functions:
+- `batch_check_membership`: Check membership of a wallet in several groups with a single Multicall3 RPC.
+
 Note: All classes extend the `GroupManager` abstract class and implement the `is_member` method to determine group membership.
 """
 
 from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache
 import logging
-from typing import Callable
+from typing import Callable, List, Optional, Tuple
 
+from eth_abi import encode
+from eth_utils import function_abi_to_4byte_selector
 from web3 import Web3, HTTPProvider
+from web3.exceptions import Web3Exception
 
 from siwe_auth import constants
 
@@ -43,23 +50,49 @@ class GroupManager(ABC):
         """
         pass
 
+    def build_call(self, ethereum_address: str, provider: HTTPProvider) -> Optional[Tuple[str, bytes]]:
+        """
+        Optional hook used to batch membership checks through Multicall3.
+        :param ethereum_address: Ethereum address to check membership of.
+        :param provider: Web3 provider to use for membership check.
+        Managers returning a call must also implement `is_member_from_result(result)`,
+        decoding the raw return data of that call into a membership result.
+        :return: Tuple of (target contract address, encoded calldata), or None if the check can not be batched.
+        """
+        return None
+
+    def _check_membership(self, wallet: object, provider: HTTPProvider) -> Optional[bool]:
+        """
+        Membership check used by `batch_check_membership`, None when membership could not be verified.
+        """
+        return self.is_member(wallet=wallet, provider=provider)
+
     def _valid_wallet(self, wallet: object):
-        return wallet.__getattribute__('ethereum_address') is not None
+        return getattr(wallet, 'ethereum_address', None) is not None
     
 
-class ERC1155Manager(GroupManager):
+class _BalanceOfMixin:
+    """
+    Shared `balanceOf` plumbing for token standard managers.
+    Subclasses provide `contract`, `abi` and, if needed, extra `balanceOf` arguments.
+    """
 
     contract: str
-    token_id: int
-    abi = constants.ERC1155_ABI
+    abi: list
+    _contract = None
 
-    def __init__(self, config: dict):
-        if "contract" not in config:
-            raise ValueError(constants.ERROR_CONFIG("ERC1155", "contract"))
-        if "token_id" not in config:
-            raise ValueError(constants.ERROR_CONFIG("ERC1155", "token_id"))
-        self.contract = config["contract"]
-        self.token_id = int(config["token_id"])
+    def _balance_of_args(self, ethereum_address: str) -> list:
+        return [Web3.to_checksum_address(ethereum_address.lower())]
+
+    def _get_contract(self, provider: HTTPProvider):
+        """
+        Return the contract bound to the given provider, building it only
+        when the manager has not been used with that provider before.
+        """
+        if self._contract is None or self._contract.w3.provider is not provider:
+            w3 = Web3(provider)
+            self._contract = w3.eth.contract(address=self.contract, abi=self.abi)
+        return self._contract
 
     def _is_member(
         self,
@@ -67,25 +100,16 @@ class ERC1155Manager(GroupManager):
         provider: HTTPProvider,
         expression: Callable[[str], bool],
     ):
-        w3 = Web3(provider)
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(self.contract.lower()), abi=self.abi
-        )
-        balance = contract.functions.balanceOf(
-            _owner=Web3.to_checksum_address(ethereum_address.lower()),
-            _id=self.token_id,
-        ).call()
+        contract = self._get_contract(provider)
+        balance = contract.functions.balanceOf(*self._balance_of_args(ethereum_address)).call()
         return expression(balance)
 
-    @abstractmethod
-    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
-        pass
-
-
-class ERC1155OwnerManager(ERC1155Manager):
-    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
+    def _check_owner(self, wallet: object, provider: HTTPProvider) -> Optional[bool]:
+        """
+        Owner membership: the wallet holds a positive balance, None when it could not be verified.
+        """
         if not self._valid_wallet(wallet=wallet):
-            return False
+            return None
         try:
             return self._is_member(
                 ethereum_address=wallet.ethereum_address,
@@ -93,33 +117,74 @@ class ERC1155OwnerManager(ERC1155Manager):
                 expression=lambda x: x > 0,
             )
         except ValueError:
-            logging.error(constants.ERROR_UNABLE_TO_VERIFY_MEMBERSHIP(wallet.ethereum_address))
-        return False
+            logging.error(constants.LOG_UNABLE_TO_VERIFY_MEMBERSHIP, wallet.ethereum_address)
+        return None
+
+    def _owner_is_member(self, wallet: object, provider: HTTPProvider) -> bool:
+        """
+        `is_member` of the owner managers.
+        """
+        return bool(self._check_owner(wallet=wallet, provider=provider))
+
+    def _check_membership(self, wallet: object, provider: HTTPProvider) -> Optional[bool]:
+        if type(self).is_member is _BalanceOfMixin._owner_is_member:
+            return self._check_owner(wallet=wallet, provider=provider)
+        return super()._check_membership(wallet=wallet, provider=provider)
+
+    @cached_property
+    def _balance_of_signature(self) -> Tuple[bytes, list]:
+        """
+        Selector and argument types of `balanceOf`, parsed from the ABI once per manager.
+        """
+        fn_abi = next(item for item in self.abi if item.get("name") == "balanceOf")
+        return function_abi_to_4byte_selector(fn_abi), [arg["type"] for arg in fn_abi["inputs"]]
+
+    def build_call(self, ethereum_address: str, provider: HTTPProvider) -> Optional[Tuple[str, bytes]]:
+        # Only the owner check is mirrored by `is_member_from_result`, custom `is_member` overrides run as is.
+        if type(self).is_member is not _BalanceOfMixin._owner_is_member:
+            return None
+        selector, arg_types = self._balance_of_signature
+        calldata = selector + encode(arg_types, self._balance_of_args(ethereum_address))
+        return self.contract, calldata
+
+    def is_member_from_result(self, result: bytes) -> bool:
+        return int.from_bytes(result, "big") > 0
+
+
+class ERC1155Manager(_BalanceOfMixin, GroupManager):
+
+    contract: str
+    token_id: int
+    abi = constants.ERC1155_ABI
+
+    def __init__(self, config: dict):
+        if "contract" not in config:
+            raise ValueError(constants.ERROR_CONFIG("ERC1155", "contract"))
+        if "token_id" not in config:
+            raise ValueError(constants.ERROR_CONFIG("ERC1155", "token_id"))
+        self.contract = Web3.to_checksum_address(config["contract"].lower())
+        self.token_id = int(config["token_id"])
+
+    def _balance_of_args(self, ethereum_address: str) -> list:
+        return super()._balance_of_args(ethereum_address) + [self.token_id]
+
+    @abstractmethod
+    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
+        pass
+
+
+class ERC1155OwnerManager(ERC1155Manager):
+    is_member = _BalanceOfMixin._owner_is_member
     
     
-class ERC20Manager(GroupManager):
+class ERC20Manager(_BalanceOfMixin, GroupManager):
     contract: str
     abi = constants.ERC20_ABI
 
     def __init__(self, config: dict):
         if "contract" not in config:
             raise ValueError(constants.ERROR_CONFIG("ERC20", "contract"))
-        self.contract = config["contract"]
-
-    def _is_member(
-        self,
-        ethereum_address: str,
-        provider: HTTPProvider,
-        expression: Callable[[str], bool],
-    ):
-        w3 = Web3(provider)
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(self.contract.lower()), abi=self.abi
-        )
-        balance = contract.functions.balanceOf(
-            _owner=Web3.to_checksum_address(ethereum_address.lower())
-        ).call()
-        return expression(balance)
+        self.contract = Web3.to_checksum_address(config["contract"].lower())
 
     @abstractmethod
     def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
@@ -127,43 +192,17 @@ class ERC20Manager(GroupManager):
 
 
 class ERC20OwnerManager(ERC20Manager):
-    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
-        if not self._valid_wallet(wallet=wallet):
-            return False
-        try:
-            return self._is_member(
-                ethereum_address=wallet.ethereum_address,
-                provider=provider,
-                expression=lambda x: x > 0,
-            )
-        except ValueError:
-            logging.error(constants.ERROR_UNABLE_TO_VERIFY_MEMBERSHIP(wallet.ethereum_address))
-        return False
+    is_member = _BalanceOfMixin._owner_is_member
     
 
-class ERC721Manager(GroupManager):
+class ERC721Manager(_BalanceOfMixin, GroupManager):
     contract: str
     abi = constants.ERC721_ABI
 
     def __init__(self, config: dict):
         if "contract" not in config:
             raise ValueError(constants.ERROR_CONFIG("ERC721", "contract"))
-        self.contract = config["contract"]
-
-    def _is_member(
-        self,
-        ethereum_address: str,
-        provider: HTTPProvider,
-        expression: Callable[[str], bool],
-    ):
-        w3 = Web3(provider)
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(self.contract.lower()), abi=self.abi
-        )
-        balance = contract.functions.balanceOf(
-            _owner=Web3.to_checksum_address(ethereum_address.lower())
-        ).call()
-        return expression(balance)
+        self.contract = Web3.to_checksum_address(config["contract"].lower())
 
     @abstractmethod
     def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
@@ -171,15 +210,58 @@ class ERC721Manager(GroupManager):
 
 
 class ERC721OwnerManager(ERC721Manager):
-    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
-        if not self._valid_wallet(wallet=wallet):
-            return False
-        try:
-            return self._is_member(
-                ethereum_address=wallet.ethereum_address,
-                provider=provider,
-                expression=lambda x: x > 0,
-            )
-        except ValueError:
-            logging.error(constants.ERROR_UNABLE_TO_VERIFY_MEMBERSHIP(wallet.ethereum_address))
-        return False
+    is_member = _BalanceOfMixin._owner_is_member
+
+
+@lru_cache(maxsize=1)
+def _get_multicall(provider: HTTPProvider):
+    return Web3(provider).eth.contract(
+        address=constants.MULTICALL3_ADDRESS, abi=constants.MULTICALL3_ABI
+    )
+
+
+def batch_check_membership(
+    wallet: object, managers: List[GroupManager], provider: HTTPProvider, use_multicall: bool = True
+) -> List[Optional[bool]]:
+    """
+    Check membership of a wallet for several group managers at once.
+    Managers implementing `build_call` are resolved with a single Multicall3 `aggregate3` RPC,
+    the rest fall back to their own `is_member`.
+    :param wallet: Object with ethereum_address attribute to check membership of.
+    :param managers: Group managers to check membership against.
+    :param provider: Web3 provider to use for membership check.
+    :param use_multicall: Batch calls through Multicall3, disable on chains where it is not deployed.
+    :return: List of membership results, in the same order as managers. None where membership could not be verified.
+    """
+    if not managers:
+        return []
+
+    results = [None] * len(managers)
+    batched = []
+    for index, manager in enumerate(managers):
+        if not manager._valid_wallet(wallet=wallet):
+            continue
+        call = manager.build_call(wallet.ethereum_address, provider) if use_multicall else None
+        if call is None:
+            results[index] = manager._check_membership(wallet=wallet, provider=provider)
+        else:
+            batched.append((index, call))
+
+    if not batched:
+        return results
+
+    calls = [(target, True, calldata) for _, (target, calldata) in batched]
+    try:
+        responses = _get_multicall(provider).functions.aggregate3(calls).call()
+    except (ValueError, Web3Exception):
+        logging.warning(constants.ERROR_MULTICALL_FAILED)
+        for index, _ in batched:
+            results[index] = managers[index]._check_membership(wallet=wallet, provider=provider)
+        return results
+
+    for (index, _), (success, return_data) in zip(batched, responses):
+        if success and return_data:
+            results[index] = managers[index].is_member_from_result(return_data)
+        else:
+            logging.error(constants.LOG_UNABLE_TO_VERIFY_MEMBERSHIP, wallet.ethereum_address)
+    return results
@@ -0,0 +1,28 @@
+"""
+Management command to delete expired nonces.
+
+Run it periodically (e.g. from cron) to keep the nonce table small:
+```bash
+python manage.py scrub_nonces --batch-size 1000
+```
+"""
+
+from django.core.management.base import BaseCommand
+
+from siwe_auth import utils
+
+
+class Command(BaseCommand):
+    help = "Delete all expired SIWE nonces."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of nonces deleted per query, 0 deletes all of them at once (default 1000).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = utils._scrub_nonce(batch_size=options["batch_size"])
+        self.stdout.write(f"Deleted {deleted} expired nonce(s).")
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('siwe_auth', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nonce',
+            index=models.Index(fields=['expiration'], name='nonce_exp_idx'),
+        ),
+    ]
@@ -12,6 +12,9 @@ Classes:
 Note: The `AbstractWallet` class extends Django's `AbstractBaseUser` and `PermissionsMixin` to provide essential functionality for user authentication.
 """
 
+from functools import lru_cache
+import re
+
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -24,8 +27,19 @@ from web3 import Web3
 from siwe_auth import constants
 
 
+_ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}\Z")
+
+
+@lru_cache(maxsize=4096)
+def _is_checksum_address(value: str) -> bool:
+    return Web3.is_checksum_address(value)
+
+
 def validate_ethereum_address(value):
-    if not Web3.is_checksum_address(value):
+    # Reject malformed values before paying for the keccak checksum.
+    if not isinstance(value, str) or not _ADDRESS_RE.match(value):
+        raise ValidationError(constants.ERROR_INVALID_ADDRESS)
+    if not _is_checksum_address(value):
         raise ValidationError(constants.ERROR_INVALID_ADDRESS)
 
 
@@ -106,5 +120,10 @@ class Nonce(models.Model):
     value = models.CharField(max_length=24, primary_key=True)
     expiration = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["expiration"], name="nonce_exp_idx"),
+        ]
+
     def __str__(self):
         return self.value
@@ -0,0 +1,74 @@
+"""
+Background tasks for SIWE Authentication.
+
+This module defines the tasks that can be run outside of the login request when `ASYNC_AUTH_TASKS` is enabled.
+Tasks are registered as Celery shared tasks if Celery is installed. Login tasks are sent to Celery workers,
+which must be selected explicitly with `ASYNC_TASK_BACKEND = "celery"`.
+
+Tasks:
+- `refresh_ens_profile`: Resolve and store the ENS profile (name and avatar) of a wallet.
+- `sync_custom_groups`: Check and update the custom group memberships of a wallet.
+- `scrub_nonces`: Delete expired nonces, meant to be scheduled periodically (e.g. with Celery beat).
+"""
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from siwe_auth import constants, utils
+from siwe_auth.backends import ENSProfile
+from siwe_auth.conf import settings
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional
+    shared_task = None
+
+WalletModel = get_user_model()
+
+
+def _task(func):
+    return shared_task(func) if shared_task else func
+
+
+def check_backend():
+    """
+    Raise ImproperlyConfigured unless background tasks can be sent to Celery workers.
+    """
+    if settings.ASYNC_TASK_BACKEND != "celery":
+        raise ImproperlyConfigured(constants.ERROR_ASYNC_TASK_BACKEND)
+    if shared_task is None:
+        raise ImproperlyConfigured(constants.ERROR_CELERY_NOT_INSTALLED)
+
+
+def enqueue(task, *args):
+    """
+    Send the task to a Celery worker once the current transaction commits, so it sees the rows written by the login.
+    """
+    check_backend()
+    transaction.on_commit(partial(task.delay, *args))
+
+
+@_task
+def refresh_ens_profile(ethereum_address: str):
+    ens_profile = ENSProfile(ethereum_address=ethereum_address, w3=utils._get_w3(settings.PROVIDER))
+    WalletModel.objects.filter(pk=ethereum_address).update(
+        ens_name=ens_profile.name, ens_avatar=ens_profile.avatar
+    )
+
+
+@_task
+def sync_custom_groups(ethereum_address: str):
+    try:
+        wallet = WalletModel.objects.only("ethereum_address").get(pk=ethereum_address)
+    except WalletModel.DoesNotExist:
+        return
+    w3 = utils._get_w3(settings.PROVIDER)
+    utils._check_groups(settings._group_names, settings._group_managers, wallet, w3.provider)
+
+
+@_task
+def scrub_nonces(batch_size: int = 1000) -> int:
+    return utils._scrub_nonce(batch_size=batch_size)
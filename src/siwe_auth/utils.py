@@ -1,22 +1,57 @@
-from datetime import datetime
+from datetime import timedelta
+from functools import lru_cache
+import json
 import logging
+from operator import attrgetter
 import re
+import secrets
+import string
+from typing import Optional
 
 from django.contrib.auth import models as auth_models
-from django.forms import model_to_dict
-import pytz
-from web3 import HTTPProvider
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from web3 import HTTPProvider, Web3
+from web3.middleware import geth_poa_middleware
 
 from siwe_auth import groups, models, constants
+from siwe_auth.conf import settings
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
+
+# JSON helpers (orjson when installed):
+def _json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _json_response(data: dict, status: int = 200) -> HttpResponse:
+    if orjson is None:
+        return JsonResponse(data=data, status=status)
+    return HttpResponse(orjson.dumps(data), status=status, content_type="application/json")
+# ----------------------------------------------------------------- #
 
 # Dictionary formatters:
+_CAMEL_CASE_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+# EIP-4361 message fields, converted once so login requests only do dictionary lookups.
+_SIWE_MESSAGE_KEYS = {
+    key: _CAMEL_CASE_RE.sub("_", key).lower()
+    for key in (
+        "domain", "address", "statement", "uri", "version", "chainId", "nonce",
+        "issuedAt", "expirationTime", "notBefore", "requestId", "resources",
+    )
+}
+
 def _dict_camel_case_to_snake_case(data: dict) -> dict:
     """
     Converts keys in dictionary from camel case to snake case.
     """
     return {
-        re.sub(r"(?<!^)(?=[A-Z])", "_", k).lower(): v
+        _SIWE_MESSAGE_KEYS.get(k) or _CAMEL_CASE_RE.sub("_", k).lower(): v
         for k, v in data.items()
     }
 # ----------------------------------------------------------------- #
@@ -66,63 +101,146 @@ def _handle_exception(e: Exception):
     return data, status
 # ----------------------------------------------------------------- #
 
+# Web3 utils:
+@lru_cache(maxsize=1)
+def _get_w3(provider_uri: str) -> Web3:
+    """
+    Return a shared Web3 instance for the given provider URI.
+    The instance is built, and its middleware injected, only once per process.
+    HTTP sessions are kept alive by web3 itself, one per thread.
+    """
+    w3 = Web3(HTTPProvider(provider_uri, request_kwargs={"timeout": 10}))
+    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+    return w3
+# ----------------------------------------------------------------- #
+
 # Wallet utils:
+_WALLET_FIELDS = ("ethereum_address", "ens_name", "ens_avatar", "is_active", "is_admin", "is_superuser")
+_get_wallet_values = attrgetter(*_WALLET_FIELDS)
+
 def _wallet_to_dict(wallet: models.Wallet) -> dict:
     """
     Convert a Wallet model instance to a dictionary with selected fields.
     """
-    wallet_fields=["ethereum_address", "ens_name", "ens_avatar", "is_active", "is_admin", "is_superuser", "groups"]
-    group_fields=["id", "name"]
-    
-    wallet = model_to_dict(wallet, wallet_fields)
-    wallet["groups"] = [model_to_dict(group, fields=group_fields) for group in wallet["groups"]]
-    
-    return wallet
-
-def _check_group(custom_group: tuple, wallet: models.Wallet, provider: HTTPProvider):
-    """
-    Check if the wallet is a member of a custom group and update its group membership.
-    Custom group is created if it not exists.
-    """
-    name: str = custom_group[0]
-    manager: groups.GroupManager = custom_group[1]
-    
-    group, created = auth_models.Group.objects.get_or_create(name=name)
-    if created:
-        logging.info(f"Created group '{name}'.")
-
-    if manager.is_member(wallet=wallet, provider=provider):
-        logging.info(
-                    f"Adding wallet '{wallet.ethereum_address}' to group '{name}'."
-                )
-        wallet.groups.add(group)
-    else:
-        logging.info(
-                    f"Removing wallet '{wallet.ethereum_address}' from group '{name}'."
-                )
-        wallet.groups.remove(group)
+    data = dict(zip(_WALLET_FIELDS, _get_wallet_values(wallet)))
+    data["groups"] = list(wallet.groups.values("id", "name"))
+
+    return data
+
+def _check_memberships(names: tuple, managers: tuple, wallet: models.Wallet, provider: HTTPProvider) -> list:
+    """
+    Resolve the wallet membership of each custom group, reusing results cached
+    for `GROUP_CACHE_TTL` seconds and batching on-chain checks for the rest.
+    Memberships that could not be verified are None and never cached.
+    """
+    ttl = settings.GROUP_CACHE_TTL
+    if not ttl:
+        return groups.batch_check_membership(wallet, managers, provider, settings.USE_MULTICALL)
+
+    keys = [f"siwe:grpmem:{wallet.ethereum_address}:{name}" for name in names]
+    cached = cache.get_many(keys)
+    missing = [index for index, key in enumerate(keys) if key not in cached]
+    if missing:
+        results = groups.batch_check_membership(
+            wallet, [managers[index] for index in missing], provider, settings.USE_MULTICALL
+        )
+        fresh = {keys[index]: result for index, result in zip(missing, results) if result is not None}
+        cache.set_many(fresh, ttl)
+        cached.update(fresh)
+    return [cached.get(key) for key in keys]
+
+def _check_groups(names: tuple, managers: tuple, wallet: models.Wallet, provider: HTTPProvider):
+    """
+    Check membership of the wallet for all custom groups, batching the on-chain
+    calls into a single Multicall3 request, and update its group membership.
+    Missing custom groups are created. Database work is batched too, regardless of the number of groups.
+    :param names: Custom group names.
+    :param managers: Group managers, in the same order as names.
+    """
+    memberships = _check_memberships(names, managers, wallet, provider)
+
+    existing = {group.name: group for group in auth_models.Group.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in existing]
+    if missing:
+        auth_models.Group.objects.bulk_create(
+            [auth_models.Group(name=name) for name in missing], ignore_conflicts=True
+        )
+        # ignore_conflicts does not set primary keys, fetch the created groups back.
+        existing.update({group.name: group for group in auth_models.Group.objects.filter(name__in=missing)})
+        for name in missing:
+            logging.info("Created group '%s'.", name)
+
+    to_add, to_remove = [], []
+    for name, is_member in zip(names, memberships):
+        if is_member is None:
+            # Unverified (e.g. a failed RPC call), keep the current membership.
+            continue
+        if is_member:
+            logging.info("Adding wallet '%s' to group '%s'.", wallet.ethereum_address, name)
+            to_add.append(existing[name])
+        else:
+            logging.info("Removing wallet '%s' from group '%s'.", wallet.ethereum_address, name)
+            to_remove.append(existing[name])
+    if to_add:
+        wallet.groups.add(*to_add)
+    if to_remove:
+        wallet.groups.remove(*to_remove)
 # ----------------------------------------------------------------- #
        
 # Nonce utils:
-def _scrub_nonce():
+# EIP-4361 nonces must be alphanumeric: 22 characters carry ~131 bits of entropy.
+_NONCE_ALPHABET = string.ascii_letters + string.digits
+_NONCE_LENGTH = 22
+_NONCE_TTL = timedelta(hours=12)
+
+def _nonce_cache_key(nonce: str) -> str:
+    return f"siwe:nonce:{nonce}"
+
+def _generate_nonce() -> str:
+    return "".join(secrets.choice(_NONCE_ALPHABET) for _ in range(_NONCE_LENGTH))
+
+def _create_nonce() -> str:
+    """
+    Generate a new nonce and store it until it expires.
+    :return: The nonce string.
+    """
+    value = _generate_nonce()
+    if settings.NONCE_STORE == "cache":
+        # The cache TTL expires the nonce, no scrubbing needed. add() never overwrites a colliding nonce.
+        while not cache.add(_nonce_cache_key(value), 1, int(_NONCE_TTL.total_seconds())):
+            value = _generate_nonce()
+    else:
+        models.Nonce.objects.create(value=value, expiration=timezone.now() + _NONCE_TTL)
+    return value
+
+def _scrub_nonce(batch_size: Optional[int] = None) -> int:
     """
     Delete all expired nonce's
+    :param batch_size: If given, delete in batches of this size to keep each transaction short.
+    :return: Number of deleted nonces.
     """
-    for n in models.Nonce.objects.filter(expiration__lte=datetime.now(tz=pytz.UTC)):
-        n.delete()
+    expired = models.Nonce.objects.filter(expiration__lte=timezone.now())
+    # Nonce has no relations nor signal receivers, so skip the collector and issue raw DELETEs.
+    if not batch_size:
+        return expired._raw_delete(expired.db)
+
+    deleted = 0
+    while True:
+        pks = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        batch = models.Nonce.objects.filter(pk__in=pks)
+        deleted += batch._raw_delete(batch.db)
         
 def _nonce_is_valid(nonce: str) -> bool:
     """
-    Check if given nonce exists and has not yet expired.
+    Check if given nonce exists and has not yet expired, consuming it.
+    The check and the deletion run as a single DELETE (or cache delete), so a nonce can
+    only be used once even under concurrent requests. Expired nonces are left to `_scrub_nonce`.
     :param nonce: The nonce string to validate.
     :return: True if valid else False.
     """
-    try:
-        n = models.Nonce.objects.get(value=nonce)
-        is_valid = False
-        if n.expiration > datetime.now(tz=pytz.UTC):
-            is_valid = True
-        n.delete()
-        return is_valid
-    except models.Nonce.DoesNotExist:
-        return False
+    if settings.NONCE_STORE == "cache":
+        return bool(cache.delete(_nonce_cache_key(nonce)))
+    valid = models.Nonce.objects.filter(value=nonce, expiration__gt=timezone.now())
+    return valid._raw_delete(valid.db) > 0
@@ -13,6 +13,7 @@ The views are designed to integrate seamlessly with the SIWE authentication syst
 Web3 and SIWE message verification to authenticate users based on Ethereum addresses and signatures.
 
 File Structure:
+- siwe_view: Decorator with the common CSRF, HTTP method, authentication and error handling
 - login: Handle user login with SIWE protocol
 - logout: Handle user logout
 - nonce: Generate and provide nonce for SIWE message
@@ -25,31 +26,47 @@ HTTP Status Codes:
 - 400 Bad Request: Validation error
 - 401 Unauthorized: Authentication failure
 - 403 Forbidden: Access denied
+- 413 Payload Too Large: Request body too large
 - 500 Internal Server Error: Unexpected server error
 
 Author: Giovanni Borgogno
 Date: January 27th, 2024
 """
 
-from datetime import datetime, timedelta
-import json
-import secrets
+from functools import wraps
 
 from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout, update_session_auth_hash
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_http_methods
-import pytz
 from siwe import SiweMessage
 
-from siwe_auth import models, utils, constants
+from siwe_auth import utils, constants
 from siwe_auth.conf import settings
 
+
 csrf_decorator = csrf_exempt if settings.CSRF_EXEMPT else csrf_protect
 
 
-@csrf_decorator
-@require_http_methods(["POST"])
+def siwe_view(methods: list, require_auth: bool = False):
+    """
+    Decorator applying the common SIWE view preamble: CSRF policy, allowed HTTP methods,
+    optional authentication check (401) and exception handling into JSON error responses.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                if require_auth and not request.user.is_authenticated:
+                    return utils._json_response(data={"success": False, "message": constants.MESSAGE_STATUS_401}, status=401)
+                return view(request, *args, **kwargs)
+            except Exception as e: 
+                data, status = utils._handle_exception(e)
+                return utils._json_response(data=data, status=status)
+        return csrf_decorator(require_http_methods(methods)(wrapper))
+    return decorator
+
+
+@siwe_view(["POST"])
 def login(request):
     """
     Handle user login via Sign-In with Ethereum (SIWE) protocol (EIP-4361).
@@ -62,31 +79,29 @@ def login(request):
     - 400 Bad Request: Validation error
     - 401 Unauthorized: Invalid login
     - 403 Forbidden: Wallet is disabled
+    - 413 Payload Too Large: Request body exceeds the maximum login body size
     - 500 Internal Server Error: Unexpected error during login
     """
-    try:
-        body = json.loads(request.body)
-        auth_kwargs = {
-            "siwe_message": SiweMessage(
-                message=utils._dict_camel_case_to_snake_case(body["message"])
-                ),
-            "signature": body["signature"]
-            }
-        wallet = authenticate(request, **auth_kwargs)
-        if not wallet:
-            return JsonResponse(data={"success": False, "message": constants.MESSAGE_STATUS_401}, status=401)
-        if not wallet.is_active:
-            return JsonResponse(data={"success": False, "message": constants.MESSAGE_STATUS_403}, status=403)
-        auth_login(request, wallet)
-        return JsonResponse(data={"success": True, "message": constants.MESSAGE_STATUS_200("login")}, status=200)
-    
-    except Exception as e: 
-        data, status = utils._handle_exception(e)
-        return JsonResponse(data=data, status=status)
-
-
-@csrf_decorator
-@require_http_methods(["POST"])
+    # Reject oversized payloads before reading and parsing them.
+    if int(request.META.get("CONTENT_LENGTH") or 0) > constants.MAX_LOGIN_BODY_SIZE:
+        return utils._json_response(data={"success": False, "message": constants.MESSAGE_STATUS_413}, status=413)
+    body = utils._json_loads(request.body)
+    auth_kwargs = {
+        "siwe_message": SiweMessage(
+            message=utils._dict_camel_case_to_snake_case(body["message"])
+            ),
+        "signature": body["signature"]
+        }
+    wallet = authenticate(request, **auth_kwargs)
+    if not wallet:
+        return utils._json_response(data={"success": False, "message": constants.MESSAGE_STATUS_401}, status=401)
+    if not wallet.is_active:
+        return utils._json_response(data={"success": False, "message": constants.MESSAGE_STATUS_403}, status=403)
+    auth_login(request, wallet)
+    return utils._json_response(data={"success": True, "message": constants.MESSAGE_STATUS_200("login")}, status=200)
+
+
+@siwe_view(["POST"])
 def logout(request):
     """
     Handle user logout.
@@ -98,39 +113,26 @@ def logout(request):
     - 200 OK: Successful logout
     - 500 Internal Server Error: Unexpected error during logout
     """
-    try:
-        auth_logout(request)
-        return JsonResponse(data={"success": True, "message": constants.MESSAGE_STATUS_200("logout")})
-    except Exception as e: 
-        data, status = utils._handle_exception(e)
-        return JsonResponse(data=data, status=status)
+    auth_logout(request)
+    return utils._json_response(data={"success": True, "message": constants.MESSAGE_STATUS_200("logout")})
 
 
-@csrf_decorator
-@require_http_methods(["GET"])
+@siwe_view(["GET"])
 def nonce(request):
     """
     Generate and return a nonce for use in SIWE message.
 
-    Generates a random nonce, stores it in the database with an expiration time,
-    and returns a JSON response containing the nonce.
+    Generates a random nonce, stores it in the nonce store (database or cache) with an
+    expiration time, and returns a JSON response containing the nonce.
 
     Possible HTTP statuses:
     - 200 OK: Successful nonce generation
     - 500 Internal Server Error: Unexpected error during nonce generation
     """
-    try:
-        now = datetime.now(tz=pytz.UTC)
-        utils._scrub_nonce()
-        n = models.Nonce.objects.create(value=secrets.token_hex(12), expiration=now + timedelta(hours=12))
-        return JsonResponse(data={"success": True, "nonce": n.value})
-    except Exception as e: 
-        data, status = utils._handle_exception(e)
-        return JsonResponse(data=data, status=status)
+    return utils._json_response(data={"success": True, "nonce": utils._create_nonce()})
     
 
-@csrf_decorator
-@require_http_methods(["GET"])
+@siwe_view(["GET"], require_auth=True)
 def verify(request):
     """
     Verify the user's authentication status.
@@ -143,17 +145,10 @@ def verify(request):
     - 401 Unauthorized: User is not authenticated
     - 500 Internal Server Error: Unexpected error during verification
     """
-    try:
-        if not request.user.is_authenticated:
-            return JsonResponse(data={"success": False, "message": constants.MESSAGE_STATUS_401}, status=401)
-        return JsonResponse(data={"success": True, "message": constants.MESSAGE_STATUS_200("session verify")}, status = 200)
-    except Exception as e: 
-        data, status = utils._handle_exception(e)
-        return JsonResponse(data=data, status=status)
+    return utils._json_response(data={"success": True, "message": constants.MESSAGE_STATUS_200("session verify")}, status = 200)
     
 
-@csrf_decorator
-@require_http_methods(["POST"])
+@siwe_view(["POST"], require_auth=True)
 def refresh(request):
     """
     Refresh the user's session.
@@ -166,18 +161,11 @@ def refresh(request):
     - 401 Unauthorized: User is not authenticated
     - 500 Internal Server Error: Unexpected error during session refresh
     """
-    try:
-        if not request.user.is_authenticated:
-            return JsonResponse(data={"success": False, "message": constants.MESSAGE_STATUS_401}, status=401)
-        update_session_auth_hash(request, request.user)
-        return JsonResponse(data={"success": True, "message": constants.MESSAGE_STATUS_200("session refresh")}, status = 200)
-    except Exception as e: 
-        data, status = utils._handle_exception(e)
-        return JsonResponse(data=data, status=status)
+    update_session_auth_hash(request, request.user)
+    return utils._json_response(data={"success": True, "message": constants.MESSAGE_STATUS_200("session refresh")}, status = 200)
     
 
-@csrf_decorator
-@require_http_methods(["GET"])
+@siwe_view(["GET"], require_auth=True)
 def me(request):
     """
     Retrieve information about the authenticated user.
@@ -189,11 +177,5 @@ def me(request):
     - 401 Unauthorized: User is not authenticated
     - 500 Internal Server Error: Unexpected error during retrieval
     """
-    try:
-        if not request.user.is_authenticated:
-            return JsonResponse(data={"success": False, "message": constants.MESSAGE_STATUS_401}, status=401)
-        wallet = utils._wallet_to_dict(request.user)
-        return JsonResponse(data={"success": True, "wallet": wallet}, status = 200)
-    except Exception as e: 
-        data, status = utils._handle_exception(e)
-        return JsonResponse(data=data, status=status)
+    wallet = utils._wallet_to_dict(request.user)
+    return utils._json_response(data={"success": True, "wallet": wallet}, status = 200)
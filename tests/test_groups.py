@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+import unittest
+from unittest import mock
+
+from web3 import HTTPProvider
+
+from siwe_auth import groups
+
+CONTRACT = "0x82e01223d51eb87e16a03e24687edf0f294da6f1"
+ADDRESS = "0x5aaeb6053f3e94c9b9a09f33669435e7ef1beaed"
+
+
+class ThresholdERC20Manager(groups.ERC20OwnerManager):
+    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
+        return self._is_member(
+            ethereum_address=wallet.ethereum_address,
+            provider=provider,
+            expression=lambda x: x >= 1000,
+        )
+
+
+class CustomERC20Manager(groups.ERC20Manager):
+    def is_member(self, wallet: object, provider: HTTPProvider) -> bool:
+        return self._is_member(
+            ethereum_address=wallet.ethereum_address,
+            provider=provider,
+            expression=lambda x: x >= 1000,
+        )
+
+
+class BatchCheckMembershipTest(unittest.TestCase):
+    def setUp(self):
+        self.wallet = SimpleNamespace(ethereum_address=ADDRESS)
+        self.provider = HTTPProvider("http://localhost:8545")
+        self.multicall = mock.MagicMock()
+        patcher = mock.patch.object(groups, "_get_multicall", return_value=self.multicall)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _aggregate3_returns(self, *balances):
+        self.multicall.functions.aggregate3.return_value.call.return_value = [
+            (True, balance.to_bytes(32, "big")) for balance in balances
+        ]
+
+    def test_owner_managers_are_batched(self):
+        self._aggregate3_returns(5)
+        manager = groups.ERC20OwnerManager(config={"contract": CONTRACT})
+
+        self.assertEqual(groups.batch_check_membership(self.wallet, [manager], self.provider), [True])
+        self.multicall.functions.aggregate3.assert_called_once()
+
+    def test_failed_call_is_unverified(self):
+        self.multicall.functions.aggregate3.return_value.call.return_value = [(False, b"")]
+        manager = groups.ERC20OwnerManager(config={"contract": CONTRACT})
+
+        self.assertEqual(groups.batch_check_membership(self.wallet, [manager], self.provider), [None])
+
+    def test_failed_fallback_is_unverified(self):
+        manager = groups.ERC20OwnerManager(config={"contract": CONTRACT})
+
+        with mock.patch.object(groups._BalanceOfMixin, "_get_contract") as get_contract:
+            get_contract.return_value.functions.balanceOf.return_value.call.side_effect = ValueError
+            results = groups.batch_check_membership(self.wallet, [manager], self.provider, use_multicall=False)
+            self.assertFalse(manager.is_member(wallet=self.wallet, provider=self.provider))
+
+        self.assertEqual(results, [None])
+
+    def test_multicall_can_be_disabled(self):
+        manager = groups.ERC20OwnerManager(config={"contract": CONTRACT})
+
+        with mock.patch.object(groups._BalanceOfMixin, "_get_contract") as get_contract:
+            get_contract.return_value.functions.balanceOf.return_value.call.return_value = 5
+            results = groups.batch_check_membership(self.wallet, [manager], self.provider, use_multicall=False)
+
+        self.assertEqual(results, [True])
+        self.multicall.functions.aggregate3.assert_not_called()
+
+    def test_overridden_is_member_is_not_batched(self):
+        self._aggregate3_returns(5)
+        managers = [
+            ThresholdERC20Manager(config={"contract": CONTRACT}),
+            CustomERC20Manager(config={"contract": CONTRACT}),
+        ]
+
+        with mock.patch.object(groups._BalanceOfMixin, "_get_contract") as get_contract:
+            get_contract.return_value.functions.balanceOf.return_value.call.return_value = 5
+            results = groups.batch_check_membership(self.wallet, managers, self.provider)
+
+        self.assertEqual(results, [False, False])
+        self.multicall.functions.aggregate3.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
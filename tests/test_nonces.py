@@ -0,0 +1,69 @@
+from datetime import timedelta
+import unittest
+from unittest import mock
+
+import django
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes", "siwe_auth"],
+        AUTH_USER_MODEL="siwe_auth.Wallet",
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        SIWE_AUTH={"PROVIDER": "http://localhost:8545"},
+    )
+    django.setup()
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from siwe_auth import models, utils
+
+
+def setUpModule():
+    call_command("migrate", verbosity=0)
+
+
+class DatabaseNonceTest(TestCase):
+    def test_fresh_nonce_is_accepted_once(self):
+        nonce = utils._create_nonce()
+
+        self.assertTrue(utils._nonce_is_valid(nonce))
+        self.assertFalse(utils._nonce_is_valid(nonce))
+        self.assertFalse(models.Nonce.objects.filter(value=nonce).exists())
+
+    def test_unknown_nonce_is_rejected(self):
+        self.assertFalse(utils._nonce_is_valid("unknownnonce"))
+
+    def test_expired_nonce_is_rejected(self):
+        models.Nonce.objects.create(value="expirednonce", expiration=timezone.now() - timedelta(seconds=1))
+
+        self.assertFalse(utils._nonce_is_valid("expirednonce"))
+
+
+@override_settings(SIWE_AUTH={"PROVIDER": "http://localhost:8545", "NONCE_STORE": "cache"})
+class CacheNonceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fresh_nonce_is_accepted_once(self):
+        nonce = utils._create_nonce()
+
+        self.assertFalse(models.Nonce.objects.exists())
+        self.assertTrue(utils._nonce_is_valid(nonce))
+        self.assertFalse(utils._nonce_is_valid(nonce))
+
+    def test_colliding_nonce_is_regenerated(self):
+        with mock.patch.object(utils, "_generate_nonce", side_effect=["a" * 22, "a" * 22, "b" * 22]):
+            self.assertEqual(utils._create_nonce(), "a" * 22)
+            self.assertEqual(utils._create_nonce(), "b" * 22)
+
+        self.assertTrue(utils._nonce_is_valid("a" * 22))
+        self.assertTrue(utils._nonce_is_valid("b" * 22))
+
+
+if __name__ == "__main__":
+    unittest.main()